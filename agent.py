@@ -4,6 +4,8 @@ Agent module for generating realistic honeypot persona replies.
 
 import random
 
+from memory import Message
+
 PERSONA = {
     "name": "Rahul",
     "tech_savvy": False,
@@ -55,7 +57,7 @@ SCAM_ENGAGEMENT_REPLIES = {
 }
 
 
-def _get_conversation_stage(history: list[dict[str, str]]) -> str:
+def _get_conversation_stage(history: list[Message]) -> str:
     """
     Determine conversation stage based on message count.
 
@@ -78,18 +80,25 @@ def _get_conversation_stage(history: list[dict[str, str]]) -> str:
         return "details"
 
 
-def _select_reply(replies: list[str], history: list[dict[str, str]]) -> str:
+def _select_reply(
+    replies: list[str],
+    history: list[Message],
+    used_replies: set[str] | None = None
+) -> str:
     """
     Select a reply that hasn't been used in the conversation.
 
     Args:
         replies: List of possible reply templates.
         history: Conversation history to check for used replies.
+        used_replies: Precomputed set of assistant replies already sent.
+            Avoids rescanning history when provided.
 
     Returns:
         Selected reply string.
     """
-    used_replies = {msg.get("content", "") for msg in history if msg.get("role") == "assistant"}
+    if used_replies is None:
+        used_replies = {msg.content for msg in history if msg.role == "assistant"}
     available = [r for r in replies if r not in used_replies]
     if not available:
         available = replies
@@ -97,25 +106,28 @@ def _select_reply(replies: list[str], history: list[dict[str, str]]) -> str:
 
 
 def generate_reply(
-    history: list[dict[str, str]],
+    history: list[Message],
     latest_message: str,
-    scam_detected: bool
+    scam_detected: bool,
+    used_replies: set[str] | None = None
 ) -> str:
     """
     Generate a contextual reply based on conversation history and scam detection.
 
     Args:
-        history: List of conversation messages with 'role' and 'content' keys.
+        history: List of conversation messages.
         latest_message: The most recent message from the user/scammer.
         scam_detected: Whether scam indicators were detected in conversation.
+        used_replies: Optional set of assistant replies already sent in
+            this conversation, kept on the session.
 
     Returns:
         Generated reply string. Uses Rahul persona if scam detected,
         otherwise returns generic polite response.
     """
     if not scam_detected:
-        return _select_reply(GENERIC_REPLIES, history)
+        return _select_reply(GENERIC_REPLIES, history, used_replies)
 
     stage = _get_conversation_stage(history)
     replies = SCAM_ENGAGEMENT_REPLIES.get(stage, SCAM_ENGAGEMENT_REPLIES["confused"])
-    return _select_reply(replies, history)
+    return _select_reply(replies, history, used_replies)
@@ -2,14 +2,48 @@
 Callback module for reporting scam intelligence to GUVI evaluation endpoint.
 """
 
-import requests
-from typing import Any
+from typing import Any, Callable
+
+import httpx
 
 CALLBACK_URL = "https://hackathon.guvi.in/api/updateHoneyPotFinalResult"
 TIMEOUT = 5
 
+# (intelligence key, notes label, max items shown) in report order
+NOTE_FIELDS = (
+    ("phone_numbers", "Phone numbers", None),
+    ("upi_ids", "UPI IDs", None),
+    ("bank_accounts", "Bank accounts", None),
+    ("urls", "Phishing links", None),
+    ("suspicious_keywords", "Keywords", 5),
+)
+
+
+def create_callback_client() -> httpx.AsyncClient:
+    """
+    Create the shared HTTP client used for callbacks.
+
+    The client keeps a keep-alive connection pool so successive callbacks
+    skip the TCP/TLS handshake; failed connection attempts are retried by
+    the transport. Create it once at startup and close it on shutdown.
 
-def send_callback(session_id: str, session: dict[str, Any]) -> bool:
+    Returns:
+        Configured async HTTP client.
+    """
+    return httpx.AsyncClient(
+        timeout=TIMEOUT,
+        transport=httpx.AsyncHTTPTransport(
+            retries=2,
+            limits=httpx.Limits(max_connections=16, max_keepalive_connections=4),
+        ),
+    )
+
+
+async def send_callback(
+    client: httpx.AsyncClient,
+    session_id: str,
+    session: dict[str, Any]
+) -> bool:
     """
     Send scam intelligence report to GUVI evaluation endpoint.
 
@@ -17,6 +51,7 @@ def send_callback(session_id: str, session: dict[str, Any]) -> bool:
     and agent notes to the hackathon reporting endpoint.
 
     Args:
+        client: Shared HTTP client from create_callback_client.
         session_id: Unique identifier for the conversation session.
         session: Session dictionary containing scamDetected, scamType,
                  messages, and intelligence data.
@@ -24,7 +59,7 @@ def send_callback(session_id: str, session: dict[str, Any]) -> bool:
     Returns:
         True if callback succeeded (HTTP 200), False otherwise.
     """
-    intel = session.get("intelligence", {})
+    intel = _serialize_intelligence(session.get("intelligence", {}))
     
     # Convert snake_case to camelCase for hackathon spec compliance
     extracted_intelligence = {
@@ -38,23 +73,49 @@ def send_callback(session_id: str, session: dict[str, Any]) -> bool:
     payload = {
         "sessionId": session_id,
         "scamDetected": session.get("scamDetected", False),
-        "totalMessagesExchanged": len(session.get("messages", [])),
+        "totalMessagesExchanged": _message_count(session),
         "extractedIntelligence": extracted_intelligence,
-        "agentNotes": _generate_notes(session),
+        "agentNotes": _generate_notes(session, intel),
     }
 
     try:
-        response = requests.post(
-            CALLBACK_URL,
-            json=payload,
-            timeout=TIMEOUT
-        )
+        response = await client.post(CALLBACK_URL, json=payload)
         return response.status_code == 200
     except Exception:
         return False
 
 
-def _generate_notes(session: dict[str, Any]) -> str:
+def _message_count(session: dict[str, Any]) -> int:
+    """
+    Return the total messages exchanged, including ones trimmed from the window.
+
+    Args:
+        session: Session dictionary with messageCount and messages.
+
+    Returns:
+        Total number of messages in the conversation.
+    """
+    return session.get("messageCount", len(session.get("messages", [])))
+
+
+def _serialize_intelligence(intel: dict[str, Any]) -> dict[str, list[str]]:
+    """
+    Convert session intelligence sets into sorted lists for JSON output.
+
+    Args:
+        intel: Intelligence dictionary with set (or list) values.
+
+    Returns:
+        Dictionary mapping each field to a sorted list of strings.
+    """
+    return {
+        key: sorted(str(value) for value in values)
+        for key, values in intel.items()
+        if isinstance(values, (set, list))
+    }
+
+
+def _generate_notes(session: dict[str, Any], intel: dict[str, list[str]]) -> str:
     """
     Generate human-readable agent notes from session data.
 
@@ -62,7 +123,8 @@ def _generate_notes(session: dict[str, Any]) -> str:
     and extracted intelligence items.
 
     Args:
-        session: Session dictionary with scamType and intelligence.
+        session: Session dictionary with scamType and messages.
+        intel: Serialized intelligence dictionary with list values.
 
     Returns:
         Formatted notes string for reporting.
@@ -70,24 +132,16 @@ def _generate_notes(session: dict[str, Any]) -> str:
     notes = []
     
     scam_type = session.get("scamType", "UNKNOWN")
-    intel = session.get("intelligence", {})
     
     if session.get("scamDetected"):
         scam_details = _get_scam_details(scam_type, intel)
         notes.append(f"{scam_type} detected. {scam_details}")
     
-    if intel.get("phone_numbers"):
-        notes.append(f"Phone numbers: {', '.join(intel['phone_numbers'])}")
-    if intel.get("upi_ids"):
-        notes.append(f"UPI IDs: {', '.join(intel['upi_ids'])}")
-    if intel.get("bank_accounts"):
-        notes.append(f"Bank accounts: {', '.join(intel['bank_accounts'])}")
-    if intel.get("urls"):
-        notes.append(f"Phishing links: {', '.join(intel['urls'])}")
-    if intel.get("suspicious_keywords"):
-        notes.append(f"Keywords: {', '.join(intel['suspicious_keywords'][:5])}")
+    for key, label, limit in NOTE_FIELDS:
+        if values := intel.get(key):
+            notes.append(f"{label}: {', '.join(values[:limit])}")
     
-    msg_count = len(session.get("messages", []))
+    msg_count = _message_count(session)
     notes.append(f"Total messages: {msg_count}")
     
     return " | ".join(notes) if notes else "No significant activity detected."
@@ -104,20 +158,48 @@ def _get_scam_details(scam_type: str, intel: dict[str, Any]) -> str:
     Returns:
         Descriptive string about the scam tactics used.
     """
-    upi_ids = intel.get("upi_ids", [])
-    urls = intel.get("urls", [])
-    
-    if scam_type == "UPI_PAYMENT_SCAM" and upi_ids:
+    return _SCAM_DETAIL_HANDLERS.get(scam_type, _default_details)(intel)
+
+
+def _default_details(intel: dict[str, Any]) -> str:
+    return "Scammer used urgency and social engineering tactics"
+
+
+def _upi_payment_details(intel: dict[str, Any]) -> str:
+    upi_ids = intel.get("upi_ids")
+    if upi_ids:
         return f"Scammer requested transfer to {upi_ids[0]}"
-    elif scam_type == "PHISHING_LINK" and urls:
+    return _default_details(intel)
+
+
+def _phishing_link_details(intel: dict[str, Any]) -> str:
+    urls = intel.get("urls")
+    if urls:
         return f"Scammer shared malicious link {urls[0]}"
-    elif scam_type == "OTP_FRAUD":
-        return "Scammer attempted to steal OTP/verification code"
-    elif scam_type == "BANK_KYC_FRAUD":
-        return "Scammer impersonated bank for KYC verification"
-    elif scam_type == "JOB_SCAM":
-        return "Scammer offered fake job opportunity"
-    elif scam_type == "LOTTERY_SCAM":
-        return "Scammer claimed victim won lottery/prize"
-    else:
-        return "Scammer used urgency and social engineering tactics"
+    return _default_details(intel)
+
+
+def _otp_fraud_details(intel: dict[str, Any]) -> str:
+    return "Scammer attempted to steal OTP/verification code"
+
+
+def _bank_kyc_fraud_details(intel: dict[str, Any]) -> str:
+    return "Scammer impersonated bank for KYC verification"
+
+
+def _job_scam_details(intel: dict[str, Any]) -> str:
+    return "Scammer offered fake job opportunity"
+
+
+def _lottery_scam_details(intel: dict[str, Any]) -> str:
+    return "Scammer claimed victim won lottery/prize"
+
+
+_SCAM_DETAIL_HANDLERS: dict[str, Callable[[dict[str, Any]], str]] = {
+    "UPI_PAYMENT_SCAM": _upi_payment_details,
+    "PHISHING_LINK": _phishing_link_details,
+    "OTP_FRAUD": _otp_fraud_details,
+    "BANK_KYC_FRAUD": _bank_kyc_fraud_details,
+    "JOB_SCAM": _job_scam_details,
+    "LOTTERY_SCAM": _lottery_scam_details,
+}
@@ -2,13 +2,14 @@
 Scam detection module using keyword and regex pattern matching.
 """
 
-import re
+from functools import lru_cache
+from typing import Any
 
-SCAM_KEYWORDS = {
-    "urgent", "blocked", "verify", "otp", "upi", "kyc", "payment", "link",
-    "suspend", "expire", "immediately", "click", "account", "bank", "transfer",
-    "prize", "winner", "lottery", "refund", "update", "confirm", "credentials"
-}
+import re2
+
+from keywords import SCAM_KEYWORDS, build_automaton
+from llm_cache import MAX_TEXT_LENGTH
+from memory import Message
 
 SCAM_PATTERNS = [
     r"click\s+(here|this|the\s+link)",
@@ -21,6 +22,16 @@ SCAM_PATTERNS = [
     r"(won|winner|prize|lottery)",
 ]
 
+# Aho-Corasick automaton finds every keyword in one pass over the text.
+_KEYWORD_AUTOMATON = build_automaton(SCAM_KEYWORDS)
+
+# Single alternation compiled once at import; detection only needs to know
+# whether any pattern matches, so one linear-time RE2 search covers every
+# pattern.
+_COMBINED_PATTERN = re2.compile(
+    "(?i)" + "|".join(f"(?:{pattern})" for pattern in SCAM_PATTERNS)
+)
+
 
 def _normalize_text(text: str) -> str:
     """
@@ -40,38 +51,77 @@ def _check_keywords(text: str) -> int:
     Count scam keyword occurrences in text.
 
     Args:
-        text: Input text to analyze.
+        text: Normalized (lowercase) text to analyze.
 
     Returns:
         Number of scam keywords found.
     """
-    normalized = _normalize_text(text)
-    return sum(1 for keyword in SCAM_KEYWORDS if keyword in normalized)
+    return len({keyword for _, keyword in _KEYWORD_AUTOMATON.iter(text)})
 
 
 def _check_patterns(text: str) -> int:
     """
-    Count scam pattern matches in text.
+    Check text for any scam pattern match.
 
     Args:
         text: Input text to analyze.
 
     Returns:
-        Number of scam patterns matched.
+        1 if any scam pattern matched, 0 otherwise.
     """
-    normalized = _normalize_text(text)
-    return sum(1 for pattern in SCAM_PATTERNS if re.search(pattern, normalized))
+    return 1 if _COMBINED_PATTERN.search(text) else 0
 
 
-def detect_scam(messages: list[dict[str, str]]) -> bool:
+def _scan_message(content: str) -> tuple[bool, int]:
+    """
+    Analyze one message for scam patterns and keywords.
+
+    Results for messages up to MAX_TEXT_LENGTH characters (the bound
+    llm_cache.TextCache uses) are memoized on the raw text, since the same
+    scam templates arrive across many sessions. Longer messages are
+    scanned directly so the memo never pins large bodies in memory.
+
+    Args:
+        content: Raw message text.
+
+    Returns:
+        Tuple of (pattern matched, keyword hit count). The keyword count
+        is 0 when a pattern matched, as detection stops there.
+    """
+    if len(content) > MAX_TEXT_LENGTH:
+        return _scan_text(content)
+    return _scan_text_cached(content)
+
+
+def _scan_text(content: str) -> tuple[bool, int]:
+    """
+    Scan one message for scam patterns, then keywords, without memoizing.
+
+    Args:
+        content: Raw message text.
+
+    Returns:
+        Tuple of (pattern matched, keyword hit count), as _scan_message.
+    """
+    text = _normalize_text(content)
+    if _check_patterns(text):
+        return True, 0
+    return False, _check_keywords(text)
+
+
+_scan_text_cached = lru_cache(maxsize=4096)(_scan_text)
+
+
+def detect_scam(messages: list[Message]) -> bool:
     """
     Detect if conversation contains scam indicators.
 
     Analyzes all messages in conversation for scam keywords and patterns.
-    Returns True if threshold is met (>=3 keywords OR >=1 pattern match).
+    Returns True as soon as the threshold is met (>=3 keywords OR >=1
+    pattern match).
 
     Args:
-        messages: List of message dicts with 'content' key.
+        messages: List of conversation messages.
 
     Returns:
         True if scam detected, False otherwise.
@@ -80,11 +130,52 @@ def detect_scam(messages: list[dict[str, str]]) -> bool:
         return False
 
     total_keyword_hits = 0
-    total_pattern_hits = 0
 
     for message in messages:
-        content = message.get("content", "")
-        total_keyword_hits += _check_keywords(content)
-        total_pattern_hits += _check_patterns(content)
+        pattern_hit, keyword_hits = _scan_message(message.content)
+        if pattern_hit:
+            return True
+        total_keyword_hits += keyword_hits
+        if total_keyword_hits >= 3:
+            return True
+
+    return False
+
 
-    return total_keyword_hits >= 3 or total_pattern_hits >= 1
+def detect_scam_incremental(session: dict[str, Any]) -> bool:
+    """
+    Detect scam indicators, scanning only messages added since the last call.
+
+    Keyword hit totals and the number of scanned messages are kept on the
+    session, so each message is analyzed once over the whole conversation
+    instead of on every turn. Sessions without stored totals are scanned
+    from the start, matching detect_scam.
+
+    Args:
+        session: Session dictionary with 'messages' list.
+
+    Returns:
+        True if scam detected, False otherwise.
+    """
+    messages = session.get("messages", [])
+    scanned = session.get("scannedMessages", 0)
+    session["scannedMessages"] = len(messages)
+
+    if session.get("scamDetected"):
+        return True
+
+    keyword_hits = session.get("keywordHits", 0)
+    detected = False
+
+    for message in messages[scanned:]:
+        pattern_hit, hits = _scan_message(message.content)
+        if pattern_hit:
+            detected = True
+            break
+        keyword_hits += hits
+        if keyword_hits >= 3:
+            detected = True
+            break
+
+    session["keywordHits"] = keyword_hits
+    return detected
@@ -2,10 +2,14 @@
 Hybrid intelligence extraction module using Groq LLM with regex fallback.
 """
 
+import asyncio
 import re
 from typing import Any
 
-from groq_extractor import groq_extract
+import re2
+
+from groq_extractor import groq_extract, groq_extract_async
+from keywords import SUSPICIOUS_KEYWORDS, build_automaton
 
 PATTERNS = {
     "bank_accounts": r"\b\d{9,18}\b",
@@ -14,33 +18,30 @@ PATTERNS = {
     "phone_numbers": r"\+91[\s\-]?\d{10}|\b[6-9]\d{9}\b",
 }
 
-SUSPICIOUS_KEYWORDS = {
-    "otp", "pin", "cvv", "password", "transfer", "urgent", "blocked",
-    "suspend", "verify", "kyc", "refund", "prize", "lottery", "winner",
-    "click", "link", "account", "bank", "upi", "payment", "expired"
-}
+# One RE2 pass per field, so each field sees the whole text and overlapping
+# intel is kept (a phone number inside a UPI handle, a UPI ID or account
+# number inside a URL query). RE2 scans in linear time; the backtracking re
+# engine goes quadratic on long dotted runs without an '@' against the UPI
+# pattern.
+_FIELD_PATTERNS = tuple(
+    (key, re2.compile("(?i)" + pattern)) for key, pattern in PATTERNS.items()
+)
 
-FIELD_MAPPING = {
-    "bankAccounts": "bank_accounts",
-    "upiIds": "upi_ids",
-    "phishingLinks": "urls",
-    "phoneNumbers": "phone_numbers",
-    "suspiciousKeywords": "suspicious_keywords"
-}
+_HAS_INTEL_CHARS = re.compile(r"[\d@]|https?://", re.IGNORECASE)
 
+_KEYWORD_AUTOMATON = build_automaton(SUSPICIOUS_KEYWORDS)
 
-def _extract_pattern(text: str, pattern: str) -> list[str]:
-    """
-    Extract matches for a regex pattern from text.
+# The regex fallback costs ~0.3 ms per KB; past this length it runs in a
+# worker thread so a single huge message doesn't stall the event loop
+OFFLOAD_TEXT_LENGTH = 32768
 
-    Args:
-        text: Input text to search.
-        pattern: Regex pattern to match.
-
-    Returns:
-        List of unique matches found.
-    """
-    return list(set(re.findall(pattern, text, re.IGNORECASE)))
+FIELD_MAPPING = (
+    ("bankAccounts", "bank_accounts"),
+    ("upiIds", "upi_ids"),
+    ("phishingLinks", "urls"),
+    ("phoneNumbers", "phone_numbers"),
+    ("suspiciousKeywords", "suspicious_keywords"),
+)
 
 
 def _extract_keywords(text: str) -> list[str]:
@@ -53,55 +54,33 @@ def _extract_keywords(text: str) -> list[str]:
     Returns:
         List of suspicious keywords found.
     """
-    text_lower = text.lower()
-    return [kw for kw in SUSPICIOUS_KEYWORDS if kw in text_lower]
-
-
-def _merge_unique(existing: list[Any], new: list[Any]) -> list[Any]:
-    """
-    Merge two lists and remove duplicates.
-
-    Args:
-        existing: Existing list of items.
-        new: New items to add.
-
-    Returns:
-        Combined list with duplicates removed.
-    """
-    combined = set(existing) if existing else set()
-    combined.update(new)
-    return list(combined)
+    return list({kw for _, kw in _KEYWORD_AUTOMATON.iter(text.lower())})
 
 
 def merge_intelligence(base: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
     """
     Merge two intelligence dictionaries with deduplication.
 
+    List values are accumulated into sets on the base dictionary in place,
+    so repeated merges only hash the new items. Convert to lists at
+    serialization time.
+
     Args:
         base: Base intelligence dictionary to merge into.
         new: New intelligence data to merge.
 
     Returns:
-        Merged dictionary with deduplicated lists.
+        Merged dictionary with deduplicated sets.
     """
     if base is None:
         base = {}
     if new is None:
         return base
 
-    all_keys = set(base.keys()) | set(new.keys())
-
-    for key in all_keys:
-        base_val = base.get(key, [])
-        new_val = new.get(key, [])
-
-        if isinstance(base_val, list) and isinstance(new_val, list):
-            base[key] = _merge_unique(base_val, new_val)
-        elif isinstance(new_val, list):
-            base[key] = list(set(new_val))
-        elif isinstance(base_val, list):
-            pass
-        else:
+    for key, new_val in new.items():
+        if isinstance(new_val, (list, set)):
+            base.setdefault(key, set()).update(new_val)
+        elif not isinstance(base.get(key), set):
             base[key] = new_val
 
     return base
@@ -118,10 +97,9 @@ def _regex_extract(text: str) -> dict[str, list[str]]:
         Dictionary with extracted bank accounts, UPI IDs, URLs, phone numbers, keywords.
     """
     result = {}
-    for key, pattern in PATTERNS.items():
-        matches = _extract_pattern(text, pattern)
-        if matches:
-            result[key] = matches
+    for key, pattern in _FIELD_PATTERNS:
+        if values := {match.group() for match in pattern.finditer(text)}:
+            result[key] = list(values)
 
     keywords = _extract_keywords(text)
     if keywords:
@@ -154,39 +132,92 @@ def _normalize_groq_result(groq_result: dict) -> dict[str, list[str]]:
         Normalized dictionary with local field names.
     """
     normalized = {}
-    for groq_key, local_key in FIELD_MAPPING.items():
-        values = groq_result.get(groq_key, [])
-        if values:
+    for groq_key, local_key in FIELD_MAPPING:
+        if values := groq_result.get(groq_key):
             normalized[local_key] = values
     return normalized
 
 
+def _needs_groq(text: str) -> bool:
+    """
+    Check whether text could hold intelligence worth an LLM call.
+
+    Every intel pattern needs a digit, '@' or URL scheme; text with none of
+    these has nothing for Groq to extract beyond keywords.
+
+    Args:
+        text: Input text to check.
+
+    Returns:
+        True if Groq extraction should be attempted.
+    """
+    return bool(text and _HAS_INTEL_CHARS.search(text))
+
+
+def _merge_extracted(
+    text: str,
+    intelligence: dict[str, Any],
+    groq_result: dict
+) -> dict[str, Any]:
+    """
+    Merge Groq results, or regex results if Groq found nothing.
+
+    Args:
+        text: Input text that was analyzed.
+        intelligence: Existing intelligence dictionary to merge into.
+        groq_result: Raw result from Groq extractor (may be empty).
+
+    Returns:
+        Updated intelligence dictionary with extracted data as sets.
+    """
+    if intelligence is None:
+        intelligence = {}
+
+    if _has_values(groq_result):
+        return merge_intelligence(intelligence, _normalize_groq_result(groq_result))
+
+    return merge_intelligence(intelligence, _regex_extract(text))
+
+
 def extract_intel(text: str, intelligence: dict[str, Any]) -> dict[str, Any]:
     """
     Extract intelligence from text using hybrid Groq + regex approach.
 
     Primary: Attempts Groq LLM extraction for intelligent parsing.
     Fallback: Uses regex patterns if Groq fails or returns empty.
+    Groq is skipped entirely for text with no digits, '@' or URLs, since
+    there is nothing there for it to extract beyond keywords.
 
     Args:
         text: Input text to extract intelligence from.
         intelligence: Existing intelligence dictionary to merge into.
 
     Returns:
-        Updated intelligence dictionary with extracted data.
+        Updated intelligence dictionary with extracted data as sets.
     """
-    if intelligence is None:
-        intelligence = {}
+    groq_result = groq_extract(text) if _needs_groq(text) else {}
+    return _merge_extracted(text, intelligence, groq_result)
 
-    groq_result = groq_extract(text)
 
-    if _has_values(groq_result):
-        normalized = _normalize_groq_result(groq_result)
-        for key, values in normalized.items():
-            intelligence[key] = _merge_unique(intelligence.get(key, []), values)
-    else:
-        regex_result = _regex_extract(text)
-        for key, values in regex_result.items():
-            intelligence[key] = _merge_unique(intelligence.get(key, []), values)
-
-    return intelligence
+async def extract_intel_async(text: str, intelligence: dict[str, Any]) -> dict[str, Any]:
+    """
+    Async variant of extract_intel that batches the Groq call.
+
+    Groq requests from concurrent sessions are coalesced by the extractor's
+    micro-batcher; fallback behavior matches extract_intel. The regex
+    fallback runs in a worker thread for texts over OFFLOAD_TEXT_LENGTH.
+
+    Args:
+        text: Input text to extract intelligence from.
+        intelligence: Existing intelligence dictionary to merge into.
+
+    Returns:
+        Updated intelligence dictionary with extracted data as sets.
+    """
+    groq_result = await groq_extract_async(text) if _needs_groq(text) else {}
+    if _has_values(groq_result) or len(text) <= OFFLOAD_TEXT_LENGTH:
+        return _merge_extracted(text, intelligence, groq_result)
+
+    # Scan off the loop, but merge on it so the session is only mutated here
+    extracted = await asyncio.to_thread(_regex_extract, text)
+    return merge_intelligence(intelligence if intelligence is not None else {}, extracted)
@@ -0,0 +1,36 @@
+"""
+Shared scam keyword sets and matcher used by the detector and extractor.
+"""
+
+import ahocorasick
+
+_COMMON_KEYWORDS = frozenset({
+    "urgent", "blocked", "verify", "otp", "upi", "kyc", "payment", "link",
+    "suspend", "click", "account", "bank", "transfer", "prize", "winner",
+    "lottery", "refund"
+})
+
+SCAM_KEYWORDS = _COMMON_KEYWORDS | {
+    "expire", "immediately", "update", "confirm", "credentials"
+}
+
+SUSPICIOUS_KEYWORDS = _COMMON_KEYWORDS | {
+    "pin", "cvv", "password", "expired"
+}
+
+
+def build_automaton(keywords: frozenset[str]) -> ahocorasick.Automaton:
+    """
+    Build an Aho-Corasick automaton that finds all keywords in one pass.
+
+    Args:
+        keywords: Lowercase keywords to match.
+
+    Returns:
+        Automaton whose values are the matched keywords.
+    """
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
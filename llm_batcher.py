@@ -0,0 +1,106 @@
+"""
+Adaptive micro-batching of Groq LLM calls across concurrent requests.
+"""
+
+import asyncio
+from typing import Any, Callable
+
+BATCH_MAX = 16
+BATCH_WINDOW = 0.02
+# Keeps a combined prompt well inside the model's context window
+BATCH_MAX_CHARS = 12000
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-text LLM calls into batched calls.
+
+    Texts submitted within BATCH_WINDOW seconds of the first pending text
+    are grouped, up to BATCH_MAX texts or BATCH_MAX_CHARS characters, and
+    passed to batch_fn in a worker thread. Each caller receives its own
+    entry from the returned list. A lone text is still sent as a batch of
+    one, so batch_fn should fast-path that case.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list[str]], list[Any]],
+        max_batch: int = BATCH_MAX,
+        window: float = BATCH_WINDOW,
+        max_chars: int = BATCH_MAX_CHARS
+    ):
+        self._batch_fn = batch_fn
+        self._max_batch = max_batch
+        self._window = window
+        self._max_chars = max_chars
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def submit(self, text: str) -> Any:
+        """
+        Queue text for the next batch and wait for its result.
+
+        Args:
+            text: Input text for the LLM.
+
+        Returns:
+            Result produced by batch_fn for this text.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Queue and collector are bound to the loop they were created on
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._spawn(self._collect(self._queue))
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _collect(self, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        carry = None
+
+        while True:
+            entry = carry or await queue.get()
+            carry = None
+            batch = [entry]
+            chars = len(entry[0])
+            deadline = loop.time() + self._window
+
+            while len(batch) < self._max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if chars + len(entry[0]) > self._max_chars:
+                    carry = entry
+                    break
+                batch.append(entry)
+                chars += len(entry[0])
+
+            # Dispatch without waiting so the next batch can start collecting
+            self._spawn(self._dispatch(batch))
+
+    async def _dispatch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        try:
+            results = await asyncio.to_thread(self._batch_fn, [text for text, _ in batch])
+            pairs = list(zip(batch, results, strict=True))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in pairs:
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,68 @@
+"""
+Bounded LRU cache for Groq LLM results keyed on a digest of the input text.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+MAX_ENTRIES = 2048
+MAX_TEXT_LENGTH = 4096
+
+
+class TextCache:
+    """
+    Thread-safe LRU cache mapping input text to an LLM result.
+
+    Keys are 16-byte blake2b digests so memory stays bounded regardless of
+    text length. Texts longer than max_text_length are never cached since
+    they are unlikely to recur.
+    """
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_text_length: int = MAX_TEXT_LENGTH):
+        self._max_entries = max_entries
+        self._max_text_length = max_text_length
+        self._entries: OrderedDict[bytes, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, text: str) -> bytes | None:
+        if len(text) > self._max_text_length:
+            return None
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+    def get(self, text: str) -> Any | None:
+        """
+        Return the cached result for text, or None on a miss.
+
+        Args:
+            text: Input text previously sent to the LLM.
+
+        Returns:
+            Cached result, or None if not cached.
+        """
+        key = self._key(text)
+        if key is None:
+            return None
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, text: str, result: Any) -> None:
+        """
+        Store the result for text, evicting the least recently used entry.
+
+        Args:
+            text: Input text sent to the LLM.
+            result: Result to cache for that text.
+        """
+        key = self._key(text)
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
@@ -6,24 +6,71 @@ POST /honeypot - Main API endpoint per Problem Statement
 """
 
 import os
-import uuid
+import hmac
+import secrets
+import asyncio
 import traceback
+from contextlib import asynccontextmanager
+from typing import Any
+import orjson
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from fastapi import FastAPI, Header, HTTPException, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import ValidationError
 
-from memory import load_session, save_session, append_message
-from detector import detect_scam
+from schemas import MessageBody, HistoryMessage, HoneypotRequest
+from memory import (
+    REDIS_URL, Message, load_session, save_session, update_session,
+    append_message, extend_messages, content_hash,
+    remember_reply, recall_reply
+)
+from detector import detect_scam_incremental
 from agent import generate_reply
-from extractor import extract_intel
-from callback import send_callback
-from scam_classifier import classify_scam
+from extractor import extract_intel_async, merge_intelligence
+from callback import send_callback, create_callback_client
+from scam_classifier import classify_scam_async
+
+
+# Resolved once at import; when unset, any non-empty x-api-key is accepted
+_API_KEY = os.getenv("API_KEY", "").encode()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+# Error bodies never change, so they are serialized once at import
+_MISSING_API_KEY = orjson.dumps({"status": "error", "reply": "x-api-key header required"})
+_INVALID_API_KEY = orjson.dumps({"status": "error", "reply": "Invalid API key"})
+_INVALID_BODY = orjson.dumps({"status": "error", "reply": "Invalid JSON body"})
+_NO_MESSAGE_TEXT = orjson.dumps({"status": "error", "reply": "No message text found"})
+
+
+def _error_response(status_code: int, body: bytes) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.http_client = create_callback_client()
+    yield
+    await app.state.http_client.aclose()
+
+
+app = FastAPI(
+    title="Agentic Honeypot API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
 
-app = FastAPI(title="Agentic Honeypot API", version="1.0.0")
 
 # CORS middleware
 app.add_middleware(
@@ -35,35 +82,73 @@ app.add_middleware(
 )
 
 
-def process_background_tasks(session_id: str, user_message: str):
+def _sync_conversation_history(
+    session: dict[str, Any],
+    conv_history: list[HistoryMessage | str]
+) -> None:
+    """
+    Append client-provided history messages not yet in the session.
+
+    Mutates the session in place; the caller saves it once at the end.
+    """
+    seen = session.setdefault("seenHashes", set())
+    new_messages = []
+    digests = []
+    for msg in conv_history:
+        if isinstance(msg, HistoryMessage):
+            text, sender = msg.text, msg.sender
+        else:
+            text, sender = msg, "scammer"
+        if not text:
+            continue
+        digest = content_hash(text)
+        if digest not in seen:
+            # Added now so repeats within this history are skipped too
+            seen.add(digest)
+            role = "user" if sender in ["scammer", "user"] else "assistant"
+            new_messages.append(Message(role, text))
+            digests.append(digest)
+    extend_messages(session, new_messages, digests)
+
+
+async def process_background_tasks(session_id: str, user_message: str):
     """
     Handle heavy AI tasks in background to ensure fast API response.
-    Process: Extract Intelligence -> Classify Scam -> Send Callback
+    Process: Extract Intelligence + Classify Scam (concurrently) -> Send Callback
     """
     try:
-        session = load_session(session_id)
-        
-        # 1. Extract Intelligence (Groq LLM)
-        session["intelligence"] = extract_intel(user_message, session.get("intelligence", {}))
+        session = await load_session(session_id)
+        # Intel and scam type are only consumed by the callback, so once it
+        # has been delivered there is nothing left to compute
+        if session.get("callbackSent"):
+            return
+        conversation_text = session.get("conversationText", "")
         
-        # 2. Classify Scam Type (Groq LLM)
-        conversation_text = " ".join([m.get("content", "") for m in session["messages"]])
-        session["scamType"] = classify_scam(conversation_text)
+        # 1-2. Extract Intelligence and Classify Scam Type (Groq LLM)
+        # Independent calls, so their network round-trips overlap; each is
+        # micro-batched with the same call from concurrent sessions
+        new_intelligence, scam_type = await asyncio.gather(
+            extract_intel_async(user_message, {}),
+            classify_scam_async(conversation_text, user_message),
+        )
         
-        # Save updates
-        save_session(session_id, session)
+        # Write back only what was computed here, merging intel into the
+        # latest stored session, so messages and intel saved by overlapping
+        # requests during the LLM calls are kept
+        session = await update_session(
+            session_id,
+            {"scamType": scam_type},
+            lambda fresh: merge_intelligence(fresh.setdefault("intelligence", {}), new_intelligence)
+        )
         
         # 3. Check & Send Callback
         should_callback = (
-            len(session["messages"]) >= 10 or
+            session.get("messageCount", len(session["messages"])) >= 10 or
             any(session.get("intelligence", {}).get(k) for k in ["bank_accounts", "upi_ids", "urls", "phone_numbers"])
         )
         
-        if should_callback and not session.get("callbackSent", False):
-            success = send_callback(session_id, session)
-            if success:
-                session["callbackSent"] = True
-                save_session(session_id, session)
+        if should_callback and await send_callback(app.state.http_client, session_id, session):
+            await update_session(session_id, {"callbackSent": True})
                 
     except Exception as e:
         print(f"Background task error: {e}")
@@ -79,83 +164,87 @@ async def honeypot(request: Request, background_tasks: BackgroundTasks):
     # Check API key
     api_key = request.headers.get("x-api-key")
     if not api_key:
-        return JSONResponse(
-            status_code=401,
-            content={"status": "error", "reply": "x-api-key header required"}
-        )
+        return _error_response(401, _MISSING_API_KEY)
+    if _API_KEY and not hmac.compare_digest(api_key.encode(), _API_KEY):
+        return _error_response(401, _INVALID_API_KEY)
     
-    # Parse JSON body
+    # Parse and validate JSON body in one pass (pydantic-core)
     try:
-        body = await request.json()
+        body = HoneypotRequest.model_validate_json(await request.body())
         print(f"DEBUG: Received Headers: {request.headers}")
         print(f"DEBUG: Received Body: {body}")
-    except Exception as e:
+    except ValidationError as e:
         print(f"DEBUG: JSON Parse Error: {e}")
-        return JSONResponse(
-            status_code=400,
-            content={"status": "error", "reply": "Invalid JSON body"}
-        )
+        return _error_response(400, _INVALID_BODY)
     
     # Extract sessionId (optional)
-    session_id = body.get("sessionId") or body.get("session_id") or str(uuid.uuid4())
+    session_id = body.sessionId or body.session_id or secrets.token_hex(16)
     
     # Extract message text
-    message = body.get("message", {})
-    if isinstance(message, str):
-        user_message = message
-    elif isinstance(message, dict):
-        user_message = message.get("text") or message.get("content") or ""
+    message = body.message
+    if isinstance(message, MessageBody):
+        user_message = message.text or message.content or ""
     else:
-        user_message = str(message) if message else ""
+        user_message = message or ""
     
     if not user_message:
-        return JSONResponse(
-            status_code=400,
-            content={"status": "error", "reply": "No message text found"}
-        )
+        return _error_response(400, _NO_MESSAGE_TEXT)
     
-    # Load session
-    session = load_session(session_id)
+    # Load session once; everything below mutates it in place
+    session = await load_session(session_id)
     
     # Sync conversation history if provided
-    conv_history = body.get("conversationHistory", [])
-    if conv_history:
-        existing = {m.get("content", "") for m in session.get("messages", [])}
-        for msg in conv_history:
-            text = msg.get("text", "") if isinstance(msg, dict) else str(msg)
-            if text and text not in existing:
-                sender = msg.get("sender", "scammer") if isinstance(msg, dict) else "scammer"
-                role = "user" if sender in ["scammer", "user"] else "assistant"
-                append_message(session_id, role, text)
-        session = load_session(session_id)
+    if body.conversationHistory:
+        _sync_conversation_history(session, body.conversationHistory)
     
     # Add current message
-    append_message(session_id, "user", user_message)
-    session = load_session(session_id)
+    append_message(session, "user", user_message)
+    
+    # A repeat of an earlier message in a detected scam gets the same reply;
+    # it carries no new intel, so the background work is skipped as well
+    if session.get("scamDetected") and (reply := recall_reply(session, user_message)):
+        # Detection is settled, so the new message counts as scanned and the
+        # window can still trim
+        session["scannedMessages"] = len(session["messages"])
+        append_message(session, "assistant", reply)
+        await save_session(session_id, session)
+        return ORJSONResponse(content={"status": "success", "reply": reply})
     
-    # Detect scam (Fast local regex)
-    scam_detected = detect_scam(session["messages"])
+    # Detect scam (Fast local regex, only new messages are scanned)
+    scam_detected = detect_scam_incremental(session)
     session["scamDetected"] = scam_detected
     
     # Generate AI agent reply (Fast template selection)
     reply = generate_reply(
         history=session["messages"],
         latest_message=user_message,
-        scam_detected=scam_detected
+        scam_detected=scam_detected,
+        used_replies=session.get("usedReplies")
     )
     
-    # Add reply to session
-    append_message(session_id, "assistant", reply)
-    # Save session with messages
-    save_session(session_id, session)
+    # Add reply and save session with messages
+    append_message(session, "assistant", reply)
+    if scam_detected:
+        remember_reply(session, user_message, reply)
+    await save_session(session_id, session)
     
     # Add heavy tasks to background to prevent timeout
     background_tasks.add_task(process_background_tasks, session_id, user_message)
     
     # Return response immediately
-    return JSONResponse(content={"status": "success", "reply": reply})
+    return ORJSONResponse(content={"status": "success", "reply": reply})
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # uvloop/httptools are picked automatically when installed. Workers can
+    # only share sessions through Redis; without it stay in one process.
+    workers = (os.cpu_count() or 1) * 2 if REDIS_URL else 1
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        workers=workers
+    )
@@ -1,46 +1,233 @@
-from typing import Any
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable
 
-sessions: dict[str, dict[str, Any]] = {}
+import msgpack
+import redis.asyncio as redis
+import xxhash
 
 
-def load_session(session_id: str) -> dict[str, Any]:
-    if session_id not in sessions:
-        sessions[session_id] = {
-            "messages": [],
-            "scamDetected": False,
-            "intelligence": {}
-        }
+@dataclass(slots=True)
+class Message:
+    """A single conversation turn; slotted to keep per-message overhead low."""
+
+    role: str
+    content: str
+
+
+# Least recently used sessions are evicted past MAX_SESSIONS
+sessions: OrderedDict[str, dict[str, Any]] = OrderedDict()
+MAX_SESSIONS = 10000
+
+# With REDIS_URL set, sessions live in Redis so several workers can share
+# them; idle sessions expire after SESSION_TTL seconds
+REDIS_URL = os.getenv("REDIS_URL")
+SESSION_TTL = 3600
+_REDIS = redis.Redis.from_url(REDIS_URL) if REDIS_URL else None
+
+# Fields written only by the background task through update_session. In
+# Redis they live under their own key, so the request handler's full-session
+# save and the background task's write can never overwrite each other.
+BACKGROUND_FIELDS = ("intelligence", "scamType", "callbackSent")
+
+# msgpack extension codes for session values that have no native encoding
+_EXT_SET = 1
+_EXT_MESSAGE = 2
+
+# Most recent characters of the joined conversation kept for classification
+CONVERSATION_TEXT_LIMIT = 8000
+
+# Sliding window of messages kept per session; messageCount keeps the total.
+# The window may briefly exceed this while new messages await scanning.
+MAX_MESSAGES = 40
+
+# Replies remembered per session, keyed by the digest of the message they
+# answered, so a repeated scammer message can get the same reply again
+REPLY_MEMO_SIZE = 32
+
+
+def _new_session() -> dict[str, Any]:
+    return {
+        "messages": [],
+        "messageCount": 0,
+        "scamDetected": False,
+        "keywordHits": 0,
+        "scannedMessages": 0,
+        "conversationText": "",
+        "usedReplies": set(),
+        "seenHashes": set(),
+        "intelligence": {},
+        "replyByMessage": {}
+    }
+
+
+def _encode(value: Any) -> msgpack.ExtType:
+    if isinstance(value, set):
+        return msgpack.ExtType(_EXT_SET, msgpack.packb(list(value), default=_encode))
+    if isinstance(value, Message):
+        return msgpack.ExtType(_EXT_MESSAGE, msgpack.packb((value.role, value.content)))
+    raise TypeError(f"Cannot serialize {type(value).__name__} in session")
+
+
+def _decode(code: int, data: bytes) -> Any:
+    if code == _EXT_SET:
+        return set(msgpack.unpackb(data, ext_hook=_decode))
+    if code == _EXT_MESSAGE:
+        return Message(*msgpack.unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+def _session_key(session_id: str) -> str:
+    return f"sess:{session_id}"
+
+
+def _background_key(session_id: str) -> str:
+    return f"sess:{session_id}:bg"
+
+
+def _unpack(data: bytes) -> dict[str, Any]:
+    # replyByMessage is keyed by integer digests
+    return msgpack.unpackb(data, ext_hook=_decode, strict_map_key=False)
+
+
+async def load_session(session_id: str) -> dict[str, Any]:
+    if _REDIS is not None:
+        data, background = await _REDIS.mget(
+            _session_key(session_id), _background_key(session_id)
+        )
+        session = _unpack(data) if data else _new_session()
+        if background:
+            session.update(_unpack(background))
+        return session
+
+    if session_id in sessions:
+        sessions.move_to_end(session_id)
+    else:
+        sessions[session_id] = _new_session()
+        if len(sessions) > MAX_SESSIONS:
+            sessions.popitem(last=False)
     return sessions[session_id]
 
 
-def save_session(session_id: str, session: dict[str, Any]) -> None:
+async def save_session(session_id: str, session: dict[str, Any]) -> None:
+    if _REDIS is not None:
+        # Background-owned fields are persisted only by update_session
+        owned = {k: v for k, v in session.items() if k not in BACKGROUND_FIELDS}
+        data = msgpack.packb(owned, default=_encode)
+        await _REDIS.set(_session_key(session_id), data, ex=SESSION_TTL)
+        return
+
     sessions[session_id] = session
+    sessions.move_to_end(session_id)
+
+
+async def update_session(
+    session_id: str,
+    fields: dict[str, Any],
+    merge: Callable[[dict[str, Any]], None] | None = None
+) -> dict[str, Any]:
+    # Writes BACKGROUND_FIELDS only. The session is re-read first and merge
+    # applied to the fresh copy, so overlapping background tasks each keep
+    # what they added instead of writing back a stale snapshot.
+    session = await load_session(session_id)
+    session.update(fields)
+    if merge is not None:
+        merge(session)
+
+    if _REDIS is not None:
+        background = {k: session[k] for k in BACKGROUND_FIELDS if k in session}
+        data = msgpack.packb(background, default=_encode)
+        await _REDIS.set(_background_key(session_id), data, ex=SESSION_TTL)
+        return session
+
+    await save_session(session_id, session)
+    return session
 
 
-def append_message(session_id: str, role: str, content: str) -> dict[str, Any]:
-    session = load_session(session_id)
-    session["messages"].append({"role": role, "content": content})
-    save_session(session_id, session)
+def content_hash(content: str) -> int:
+    # 64-bit digests keep dedup state small however long the messages get
+    return xxhash.xxh64_intdigest(content.encode())
+
+
+def append_message(session: dict[str, Any], role: str, content: str) -> dict[str, Any]:
+    return extend_messages(session, [Message(role, content)])
+
+
+def extend_messages(
+    session: dict[str, Any],
+    new_messages: list[Message],
+    digests: list[int] | None = None
+) -> dict[str, Any]:
+    # Trims the window and rebuilds conversationText once per batch. Callers
+    # that already hashed the messages pass digests to avoid hashing twice.
+    if not new_messages:
+        return session
+    messages = session["messages"]
+    session["messageCount"] = session.get("messageCount", len(messages)) + len(new_messages)
+    messages.extend(new_messages)
+    # Only messages the detector has already scanned may leave the window;
+    # unscanned ones stay until detect_scam_incremental has seen them
+    scanned = session.get("scannedMessages", 0)
+    dropped = min(len(messages) - MAX_MESSAGES, scanned)
+    if dropped > 0:
+        del messages[:dropped]
+        session["scannedMessages"] = scanned - dropped
+    if digests is None:
+        digests = [content_hash(message.content) for message in new_messages]
+    session.setdefault("seenHashes", set()).update(digests)
+    used_replies = session.setdefault("usedReplies", set())
+    for message in new_messages:
+        if message.role == "assistant":
+            used_replies.add(message.content)
+    text = " ".join(m.content for m in new_messages)
+    if previous := session.get("conversationText", ""):
+        text = f"{previous} {text}"
+    session["conversationText"] = text[-CONVERSATION_TEXT_LIMIT:]
     return session
 
 
-def set_scam_detected(session_id: str, detected: bool) -> None:
-    session = load_session(session_id)
+def remember_reply(session: dict[str, Any], message: str, reply: str) -> None:
+    replies = session.setdefault("replyByMessage", {})
+    key = content_hash(message)
+    replies.pop(key, None)
+    replies[key] = reply
+    if len(replies) > REPLY_MEMO_SIZE:
+        del replies[next(iter(replies))]
+
+
+def recall_reply(session: dict[str, Any], message: str) -> str | None:
+    replies = session.get("replyByMessage", {})
+    key = content_hash(message)
+    if key not in replies:
+        return None
+    # Re-insert so eviction drops the least recently used reply
+    replies[key] = replies.pop(key)
+    return replies[key]
+
+
+async def set_scam_detected(session_id: str, detected: bool) -> None:
+    session = await load_session(session_id)
     session["scamDetected"] = detected
-    save_session(session_id, session)
+    await save_session(session_id, session)
 
 
-def update_intelligence(session_id: str, key: str, value: Any) -> None:
-    session = load_session(session_id)
-    session["intelligence"][key] = value
-    save_session(session_id, session)
+async def update_intelligence(session_id: str, key: str, value: Any) -> None:
+    def _set(session: dict[str, Any]) -> None:
+        session.setdefault("intelligence", {})[key] = value
 
+    await update_session(session_id, {}, _set)
 
-def get_messages(session_id: str) -> list[dict[str, str]]:
-    session = load_session(session_id)
+
+async def get_messages(session_id: str) -> list[Message]:
+    session = await load_session(session_id)
     return session["messages"]
 
 
-def clear_session(session_id: str) -> None:
+async def clear_session(session_id: str) -> None:
+    if _REDIS is not None:
+        await _REDIS.delete(_session_key(session_id), _background_key(session_id))
+        return
+
     if session_id in sessions:
         del sessions[session_id]
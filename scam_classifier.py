@@ -2,10 +2,12 @@
 Hybrid scam classification module using Groq LLM with rule-based fallback.
 """
 
-from groq_classifier import groq_classify
+import ahocorasick
+
+from groq_classifier import groq_classify, groq_classify_async
 
 SCAM_RULES = [
-    ({"@upi", "upi", "pay", "transfer"}, "UPI_PAYMENT_SCAM"),
+    ({"@upi", "upi", "pay", "payment", "transfer"}, "UPI_PAYMENT_SCAM"),
     ({"http", "https", "link"}, "PHISHING_LINK"),
     ({"otp", "code"}, "OTP_FRAUD"),
     ({"kyc", "verify account", "blocked"}, "BANK_KYC_FRAUD"),
@@ -14,11 +16,30 @@ SCAM_RULES = [
 ]
 
 
+def _build_rule_automaton() -> ahocorasick.Automaton:
+    # Each keyword maps to the index of the first rule that lists it, plus
+    # its length so a match's start can be located from its end offset
+    automaton = ahocorasick.Automaton()
+    for index in reversed(range(len(SCAM_RULES))):
+        for keyword in SCAM_RULES[index][0]:
+            automaton.add_word(keyword, (index, len(keyword)))
+    automaton.make_automaton()
+    return automaton
+
+
+_RULE_AUTOMATON = _build_rule_automaton()
+
+
 def classify_scam_rule_based(text: str) -> str:
     """
     Classify scam type using keyword-based rules.
 
     Checks text against predefined keyword sets to determine scam category.
+    All keywords are matched in a single Aho-Corasick pass; when several
+    rules match, the first in SCAM_RULES wins. A keyword must start and
+    end at a word boundary, allowing a plural "s", so "upi" does not fire
+    inside "stupid", "code" inside "codec" nor "job" inside "jobless",
+    while "@upi" handles and "jobs" or "winners" still match.
 
     Args:
         text: Input text to classify.
@@ -32,15 +53,60 @@ def classify_scam_rule_based(text: str) -> str:
 
     text_lower = text.lower()
 
-    for keywords, scam_type in SCAM_RULES:
-        for keyword in keywords:
-            if keyword in text_lower:
-                return scam_type
+    # One pass finds every rule hit; the earliest rule in SCAM_RULES wins
+    best = len(SCAM_RULES)
+    for end, (index, length) in _RULE_AUTOMATON.iter(text_lower):
+        start = end - length + 1
+        if start > 0 and text_lower[start - 1].isalnum():
+            continue
+        after = end + 1
+        if text_lower[after:after + 1] == "s":
+            after += 1
+        if after < len(text_lower) and text_lower[after].isalnum():
+            continue
+        if index < best:
+            best = index
+            if best == 0:
+                break
+
+    return SCAM_RULES[best][1] if best < len(SCAM_RULES) else "UNKNOWN"
+
+
+def _resolve_label(
+    text: str,
+    latest_message: str | None,
+    groq_result: str | None = None
+) -> str | None:
+    """
+    Apply the local rules around the Groq call shared by both entry points.
+
+    Called first without groq_result to see whether the rules settle the
+    label on their own, then with the Groq label to apply the fallback.
 
-    return "UNKNOWN"
+    Args:
+        text: Input text to classify.
+        latest_message: Newest message in the conversation, if known.
+        groq_result: Label returned by Groq, or None before calling it.
+
+    Returns:
+        Final scam type string, or None when Groq still has to be asked.
+    """
+    if groq_result is None:
+        if not text:
+            return "UNKNOWN"
+        if latest_message:
+            rule_result = classify_scam_rule_based(latest_message)
+            if rule_result != "UNKNOWN":
+                return rule_result
+        return None
+
+    if groq_result != "UNKNOWN":
+        return groq_result
+
+    return classify_scam_rule_based(text)
 
 
-def classify_scam(text: str) -> str:
+def classify_scam(text: str, latest_message: str | None = None) -> str:
     """
     Classify scam type using hybrid Groq + rule-based approach.
 
@@ -49,17 +115,36 @@ def classify_scam(text: str) -> str:
 
     Args:
         text: Input text to classify.
+        latest_message: Newest message in the conversation. When the rules
+            already classify it, that label is returned without calling Groq.
 
     Returns:
         Scam type string: UPI_PAYMENT_SCAM, PHISHING_LINK, OTP_FRAUD,
         BANK_KYC_FRAUD, JOB_SCAM, LOTTERY_SCAM, or UNKNOWN.
     """
-    if not text:
-        return "UNKNOWN"
+    if (label := _resolve_label(text, latest_message)) is not None:
+        return label
 
-    groq_result = groq_classify(text)
+    return _resolve_label(text, latest_message, groq_classify(text))
 
-    if groq_result != "UNKNOWN":
-        return groq_result
 
-    return classify_scam_rule_based(text)
+async def classify_scam_async(text: str, latest_message: str | None = None) -> str:
+    """
+    Async variant of classify_scam that batches the Groq call.
+
+    Groq requests from concurrent sessions are coalesced by the classifier's
+    micro-batcher; fallback behavior matches classify_scam.
+
+    Args:
+        text: Input text to classify.
+        latest_message: Newest message in the conversation. When the rules
+            already classify it, that label is returned without calling Groq.
+
+    Returns:
+        Scam type string: UPI_PAYMENT_SCAM, PHISHING_LINK, OTP_FRAUD,
+        BANK_KYC_FRAUD, JOB_SCAM, LOTTERY_SCAM, or UNKNOWN.
+    """
+    if (label := _resolve_label(text, latest_message)) is not None:
+        return label
+
+    return _resolve_label(text, latest_message, await groq_classify_async(text))
@@ -0,0 +1,28 @@
+"""
+Request models for the honeypot API.
+"""
+
+from pydantic import BaseModel, ConfigDict
+
+
+class MessageBody(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    text: str | None = None
+    content: str | None = None
+
+
+class HistoryMessage(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    sender: str | None = "scammer"
+    text: str | None = None
+
+
+class HoneypotRequest(BaseModel):
+    model_config = ConfigDict(extra="allow", coerce_numbers_to_str=True)
+
+    sessionId: str | None = None
+    session_id: str | None = None
+    message: MessageBody | str | None = None
+    conversationHistory: list[HistoryMessage | str] | None = None